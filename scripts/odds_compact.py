@@ -6,26 +6,34 @@ Coletor diário de fixtures + odds (API-FOOTBALL v3) com compactação e retenç
 
 Funcionalidades:
  - Busca jogos do dia (03:00 America/Sao_Paulo) para 5 ligas (BR A, Serie A, LaLiga, Premier, Bundesliga).
- - Faz ~11 requests: 5x /fixtures, 5x /odds?league&date (sem bet -> todos mercados), 1x /odds/bets (opcional).
+ - Faz ~7 requests: 1x /fixtures?date (todas as ligas, filtrado localmente; se falhar, 5x /fixtures por liga),
+   5x /odds?league&date (sem bet -> todos mercados), 1x /odds/bets (opcional, em cache por 7 dias em
+   data/odds/.bets_catalog.json).
+   As chamadas de /fixtures e /odds rodam em paralelo sobre uma única requests.Session.
  - Extrai mercados: Match Winner (1X2), Over/Under (prefere 2.5), BTTS, Handicap (Home -1 / Away +1), First Half Winner (1X2 HT).
- - Salva snapshot em GZIP: data/odds/YYYY/MM/DD.json.gz
+ - Salva snapshot em GZIP: data/odds/YYYY/MM/DD.json.gz (abaixo de 1 KB, sem compactar: DD.json)
  - Salva/atualiza cópia não compactada de conveniência: data/odds/latest.json
- - Retenção: remove .json.gz com mais de RETENTION_DAYS (padrão 90) em data/odds/
+ - Retenção: remove .json.gz/.json com data (no nome) anterior a RETENTION_DAYS (padrão 90) em data/odds/
+ - GET condicional: guarda ETag + corpo em data/odds/.cache/ e reaproveita em 304 (reexecuções no mesmo dia)
 
 Env vars:
  - APISPORTS_KEY (obrigatória)
  - SEASON=2025 (ano de início da temporada)
  - OUT_DIR=data/odds
  - RETENTION_DAYS=90
+ - PRETTY=1 (opcional: latest.json indentado para leitura humana)
 """
 
 from __future__ import annotations
 import os
 import re
 import json
+import glob
 import gzip
+import hashlib
 import time
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Any, Callable, Dict, List, Optional, Tuple
 
@@ -37,13 +45,30 @@ except Exception:
     import pytz
     _tz = lambda name: pytz.timezone(name)
 
+try:
+    # orjson (opcional): parse/serialização bem mais rápidos, já em bytes UTF-8
+    import orjson
+    _json_loads = orjson.loads
+    _json_dumps = lambda obj, indent=False: orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+except ImportError:
+    _json_loads = json.loads
+    _json_dumps = lambda obj, indent=False: json.dumps(obj, ensure_ascii=False, indent=2 if indent else None).encode("utf-8")
+
 import requests
+from requests.adapters import HTTPAdapter
 
 # --- Config ---------------------------------------------------------------------------
 
 API_KEY = os.getenv("APISPORTS_KEY", "SUA_CHAVE_AQUI")
 BASE = "https://v3.football.api-sports.io"
-HEADERS = {"x-apisports-key": API_KEY}
+# Accept-Encoding explícito: /odds e /fixtures vêm compactados (requests descompacta sozinho)
+HEADERS = {"x-apisports-key": API_KEY, "Accept-Encoding": "gzip, deflate"}
+
+# Sessão única com pool de conexões: reaproveita TCP/TLS (keep-alive) entre as chamadas paralelas
+HTTP_WORKERS = 8
+SESSION = requests.Session()
+SESSION.headers.update(HEADERS)
+SESSION.mount("https://", HTTPAdapter(pool_connections=HTTP_WORKERS, pool_maxsize=HTTP_WORKERS, max_retries=0))
 
 LEAGUES: Dict[str, int] = {
     "BR_SERIE_A": 71,
@@ -56,8 +81,33 @@ LEAGUES: Dict[str, int] = {
 SEASON = int(os.getenv("SEASON", "2025"))
 OUT_DIR = os.getenv("OUT_DIR", "data/odds")
 RETENTION_DAYS = int(os.getenv("RETENTION_DAYS", "90"))
+PRETTY = os.getenv("PRETTY", "") == "1"
+
+# /odds/bets muda raramente: cache em disco com TTL
+BETS_CATALOG_PATH = os.path.join(OUT_DIR, ".bets_catalog.json")
+BETS_CATALOG_TTL = 7 * 86400
+
+# GET condicional (ETag/If-None-Match): corpo + ETag da última resposta 200 por URL+params
+HTTP_CACHE_DIR = os.path.join(OUT_DIR, ".cache")
+HTTP_CACHE_TTL = 2 * 86400  # as chaves incluem a data; só reexecuções do mesmo dia aproveitam
+
+TZ_NAME_SP = "America/Sao_Paulo"
+TZ_SP = _tz(TZ_NAME_SP)
+
+# gzip nível 1: em JSON repetitivo o arquivo fica só um pouco maior e a compressão é bem mais rápida
+GZIP_LEVEL = 1
+# abaixo disso o gzip não compensa (cabeçalho + dicionário vazio deixam o arquivo maior): grava .json puro
+GZIP_MIN_BYTES = 1024
+
+# dict vazio compartilhado (somente leitura) para fallbacks `x.get(k) or EMPTY` nos loops por fixture
+EMPTY: Dict[str, Any] = {}
 
 PREFERRED_BOOKMAKERS = ["Pinnacle", "bet365", "Betfair", "Betway", "William Hill", "Bwin"]
+# peso de preferência por nome (rank 0 = mais preferido; ausentes ficam com o menor peso)
+PREFERRED_WEIGHT: Dict[str, int] = {
+    name: (len(PREFERRED_BOOKMAKERS) + 2 - rank) * 100 for rank, name in enumerate(PREFERRED_BOOKMAKERS)
+}
+UNPREFERRED_WEIGHT = 100
 
 # Mercados (regex por nome; usamos heurística para não depender de IDs fixos)
 RX_MATCH_WINNER   = re.compile(r"^(match\s*winner|1x2|win\s*draw\s*win)$", re.I)
@@ -66,226 +116,306 @@ RX_BTTS           = re.compile(r"(^both\s*teams\s*to\s*score$|^BTTS$)", re.I)
 RX_HANDICAP       = re.compile(r"(^asian\s*handicap$|^handicap(?!.*corners|.*cards))", re.I)
 RX_FIRST_HALF_WIN = re.compile(r"^(1(st)?|first)\s*half\s*(winner|1x2)", re.I)
 
+# Values (pré-compilados; usados no parsing por fixture)
+RX_NUM   = re.compile(r"-?\d+(?:\.\d+)?")
+
 # --- HTTP util com retry/backoff ------------------------------------------------------
 
+def _http_cache_base(url: str, params: Dict[str, Any] | None) -> str:
+    key = url + "?" + "&".join(f"{k}={v}" for k, v in sorted((params or {}).items()))
+    return os.path.join(HTTP_CACHE_DIR, hashlib.sha1(key.encode("utf-8")).hexdigest())
+
+def _http_cache_etag(base: str) -> Optional[str]:
+    """ETag guardado para base, só se o corpo correspondente também existir."""
+    if not os.path.exists(base + ".json"):
+        return None
+    try:
+        with open(base + ".etag", encoding="utf-8") as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+def _http_cache_store(base: str, etag: Optional[str], body: bytes) -> None:
+    if not etag:
+        return
+    try:
+        os.makedirs(HTTP_CACHE_DIR, exist_ok=True)
+        for path, data in ((base + ".json", body), (base + ".etag", etag.encode("utf-8"))):
+            with open(path + ".tmp", "wb") as f:
+                f.write(data)
+            os.replace(path + ".tmp", path)
+    except Exception as e:
+        print(f"warn: falha ao gravar cache HTTP {base}: {e}")
+
 def http_get(url: str, params: Dict[str, Any] | None = None,
-             max_retries: int = 4, timeout: int = 25) -> Dict[str, Any]:
-    """GET com backoff exponencial para 429/5xx; retorna JSON (dict)."""
+             max_retries: int = 4, timeout: int = 25, use_etag: bool = False) -> Dict[str, Any]:
+    """
+    GET com backoff exponencial para 429/5xx; retorna JSON (dict).
+    Com use_etag, envia If-None-Match do cache em HTTP_CACHE_DIR e, em 304, devolve o corpo guardado.
+    """
+    cache_base = _http_cache_base(url, params) if use_etag else None
+    etag = _http_cache_etag(cache_base) if cache_base else None
+    headers = {"If-None-Match": etag} if etag else None
     delay = 0.8
     for attempt in range(1, max_retries + 1):
-        resp = requests.get(url, headers=HEADERS, params=params, timeout=timeout)
+        resp = SESSION.get(url, params=params, headers=headers, timeout=timeout)
+        if resp.status_code == 304 and etag:
+            try:
+                with open(cache_base + ".json", "rb") as f:
+                    return _json_loads(f.read())
+            except Exception as e:
+                raise RuntimeError(f"Invalid cached JSON for {url}: {e}") from e
+
         if resp.status_code == 200:
+            body = resp.content
             try:
-                return resp.json()
+                data = _json_loads(body)
             except Exception as e:
                 raise RuntimeError(f"Invalid JSON from {url}: {e}") from e
+            if cache_base:
+                _http_cache_store(cache_base, resp.headers.get("ETag"), body)
+            return data
 
         if resp.status_code in (429, 500, 502, 503, 504):
             ra = resp.headers.get("Retry-After")
             if ra:
                 try:
-                    delay = max(delay, float(ra))
+                    # normalmente segundos inteiros; float cobre "1.5" (datas HTTP são ignoradas)
+                    delay = max(delay, int(ra) if ra.isdigit() else float(ra))
                 except Exception:
                     pass
-            if attempt < len(range(1, max_retries + 1)):
+            if attempt < max_retries:
                 time.sleep(delay)
                 delay = min(delay * 2, 10.0)
                 continue
 
+        body = resp.content
         try:
-            payload = resp.json()
+            payload = _json_loads(body)
         except Exception:
-            payload = {"status_code": resp.status_code, "text": resp.text[:2000]}
+            payload = {"status_code": resp.status_code, "text": body[:2000].decode("utf-8", "replace")}
         raise RuntimeError(f"GET {url} failed: {payload}")
 
 # --- Datas ----------------------------------------------------------------------------
 
-def today_ymd(tz_name: str = "America/Sao_Paulo") -> str:
-    tz = _tz(tz_name)
+def today_ymd(tz_name: str = TZ_NAME_SP) -> str:
+    tz = TZ_SP if tz_name == TZ_NAME_SP else _tz(tz_name)
     return datetime.now(tz).strftime("%Y-%m-%d")
 
+def to_sp_datetime_str(dt: Any) -> str:
+    """Normaliza o horário ISO da API para o fuso de SP; devolve o valor original se não parsear."""
+    try:
+        dt_parsed = datetime.fromisoformat(str(dt).replace("Z", "+00:00"))
+        return dt_parsed.astimezone(TZ_SP).strftime("%Y-%m-%d %H:%M:%S %z")
+    except Exception:
+        return str(dt)
+
 # --- API calls ------------------------------------------------------------------------
 
 def get_bets_catalog() -> List[Dict[str, Any]]:
-    """Opcional: /odds/bets (1x) para inspeção/diagnóstico."""
+    """
+    Opcional: /odds/bets para inspeção/diagnóstico, com cache em BETS_CATALOG_PATH.
+    O instante da busca fica dentro do arquivo (o mtime não serve: o checkout do git o renova).
+    """
+    cached: Dict[str, Any] = {}
     try:
-        data = http_get(f"{BASE}/odds/bets")
-        return data.get("response", []) or []
+        with open(BETS_CATALOG_PATH, "rb") as f:
+            cached = _json_loads(f.read())
+        if time.time() - float(cached.get("fetchedAt", 0)) < BETS_CATALOG_TTL:
+            return cached.get("response", []) or []
     except Exception:
-        return []
+        cached = {}
+
+    try:
+        data = http_get(f"{BASE}/odds/bets", use_etag=True)
+    except Exception:
+        # sem rede/cota: cache vencido ainda é melhor que nada
+        return cached.get("response", []) or []
+    bets = data.get("response", []) or []
+    try:
+        os.makedirs(OUT_DIR, exist_ok=True)
+        with open(BETS_CATALOG_PATH, "wb") as f:
+            f.write(_json_dumps({"fetchedAt": int(time.time()), "response": bets}))
+    except Exception as e:
+        print(f"warn: falha ao gravar {BETS_CATALOG_PATH}: {e}")
+    return bets
+
+def get_fixtures_for_date(date_ymd: str) -> Optional[List[Dict[str, Any]]]:
+    """
+    1x /fixtures?date (todas as ligas do dia) filtrado para LEAGUES/SEASON, em vez de 5 chamadas.
+    O parâmetro league não aceita lista; retorna None se a API recusar, para cair no modo por liga.
+    """
+    try:
+        data = http_get(f"{BASE}/fixtures", {"date": date_ymd}, use_etag=True)
+    except Exception:
+        return None
+    if data.get("errors"):
+        return None
+    wanted = set(LEAGUES.values())
+    out: List[Dict[str, Any]] = []
+    for f in data.get("response", []) or []:
+        league = f.get("league") or EMPTY
+        if league.get("id") in wanted and league.get("season", SEASON) == SEASON:
+            out.append(f)
+    return out
 
 def get_fixtures_for_league(league_id: int, date_ymd: str) -> List[Dict[str, Any]]:
-    data = http_get(f"{BASE}/fixtures", {"league": league_id, "season": SEASON, "date": date_ymd})
+    data = http_get(f"{BASE}/fixtures", {"league": league_id, "season": SEASON, "date": date_ymd}, use_etag=True)
     return data.get("response", []) or []
 
 def get_odds_for_league_date(league_id: int, date_ymd: str) -> List[Dict[str, Any]]:
-    data = http_get(f"{BASE}/odds", {"league": league_id, "season": SEASON, "date": date_ymd})
+    data = http_get(f"{BASE}/odds", {"league": league_id, "season": SEASON, "date": date_ymd}, use_etag=True)
     return data.get("response", []) or []
 
 # --- Parsing helpers ------------------------------------------------------------------
 
-def _val_eq(v: str):
-    lv = v.lower()
-    return lambda ov: str(ov.get("value", "")).lower() == lv
-
-def _line_from(v: Optional[Dict[str, Any]]) -> str:
-    if not v:
-        return ""
-    h = str(v.get("handicap") or "")
-    if h:
-        return h
-    m = re.search(r"-?\d+(?:\.\d+)?", str(v.get("value", "")))
-    return m.group(0) if m else ""
-
-def _nearest_to(target: float, arr: List[Dict[str, Any]], predicate: Callable[[Dict[str, Any]], bool]) -> Optional[Dict[str, Any]]:
-    """Escolhe o value (Over/Under) cuja linha numérica é mais próxima do target."""
-    best = None
-    best_dist = None
-    for ov in arr:
-        if not predicate(ov):
-            continue
-        raw = str(ov.get("handicap") or ov.get("value") or "")
-        m = re.search(r"-?\d+(?:\.\d+)?", raw)
-        if not m:
-            continue
-        try:
-            n = float(m.group(0))
-        except Exception:
-            continue
-        d = abs(n - target)
-        if best is None or d < best_dist:
-            best, best_dist = ov, d
-    return best
+# Visões normalizadas: cada book (nome, peso, nomes de bet) é preparado 1x por fixture e
+# os values só do bet escolhido viram tuplas (value minúsculo, odd, linha, linha numérica).
+NormValue = Tuple[str, Any, str, Optional[float]]
+NormBook = Tuple[Any, int, List[Tuple[str, Dict[str, Any]]]]
 
-def _is_team_value(v: Dict[str, Any], team: str) -> bool:
-    value = str(v.get("value", ""))
-    if team.lower() == "home":
-        return (
-            _val_eq("Home")(v)
-            or _val_eq("1")(v)
-            or re.search(r"(?i)home", value)
-        )
-    if team.lower() == "away":
-        return (
-            _val_eq("Away")(v)
-            or _val_eq("2")(v)
-            or re.search(r"(?i)away", value)
-        )
-    return False
-
-def _handicap_numeric(v: Dict[str, Any]) -> Optional[float]:
-    raw = str(v.get("handicap") or v.get("value") or "")
-    m = re.search(r"-?\d+(?:\.\d+)?", raw)
-    if not m:
-        return None
-    try:
-        return float(m.group(0))
-    except Exception:
-        return None
+def _normalize_books(books: List[Dict[str, Any]]) -> List[NormBook]:
+    out: List[NormBook] = []
+    for book in books or []:
+        name = book.get("name")
+        weight = PREFERRED_WEIGHT.get(str(name if name is not None else ""), UNPREFERRED_WEIGHT)
+        bets = [(str(b.get("name", "")), b) for b in book.get("bets") or []]
+        out.append((name, weight, bets))
+    return out
+
+def _normalize_values(vals: List[Dict[str, Any]]) -> List[NormValue]:
+    out: List[NormValue] = []
+    for v in vals:
+        value = str(v.get("value", ""))
+        line = str(v.get("handicap") or "")
+        if not line:
+            m = RX_NUM.search(value)
+            line = m.group(0) if m else ""
+        m = RX_NUM.search(line)
+        out.append((value.lower(), v.get("odd"), line, float(m.group(0)) if m else None))
+    return out
 
-def _pick_bookmaker(books: List[Dict[str, Any]], bet_name_rx: re.Pattern
-                   ) -> Optional[Tuple[Dict[str, Any], Dict[str, Any]]]:
-    """Escolhe (book, bet) preferindo bookmakers em PREFERRED_BOOKMAKERS e com mais valores."""
+def _odds_by_value(vals: List[NormValue]) -> Dict[str, Any]:
+    """Mapa value (minúsculo) -> odd em uma única passada; mantém a primeira ocorrência."""
+    lookup: Dict[str, Any] = {}
+    for value, odd, _, _ in vals:
+        lookup.setdefault(value, odd)
+    return lookup
+
+def _nearest_over_under(target: float, vals: List[NormValue]
+                       ) -> Tuple[Optional[NormValue], Optional[NormValue]]:
+    """Escolhe, em uma única passada, os values Over e Under cuja linha numérica é mais próxima do target."""
+    over_best = under_best = None
+    over_dist = under_dist = None
+    for nv in vals:
+        value, _, _, num = nv
+        if num is None:
+            continue
+        is_over = value.startswith("over")
+        if not is_over and not value.startswith("under"):
+            continue
+        d = abs(num - target)
+        if is_over:
+            if over_best is None or d < over_dist:
+                over_best, over_dist = nv, d
+        elif under_best is None or d < under_dist:
+            under_best, under_dist = nv, d
+    return over_best, under_best
+
+def _pick_bookmaker(books: List[NormBook], bet_name_rx: re.Pattern
+                   ) -> Optional[Tuple[Any, Dict[str, Any]]]:
+    """Escolhe (nome do book, bet) preferindo bookmakers em PREFERRED_BOOKMAKERS e com mais valores."""
     best = None
     best_score = None
-    for book in books or []:
-        bets = book.get("bets") or []
-        bet = next((b for b in bets if bet_name_rx.search(str(b.get("name", "")))), None)
+    for name, weight, bets in books:
+        bet = next((b for bet_name, b in bets if bet_name_rx.search(bet_name)), None)
         if not bet:
             continue
-        name = str(book.get("name", ""))
-        pref_rank = PREFERRED_BOOKMAKERS.index(name) if name in PREFERRED_BOOKMAKERS else len(PREFERRED_BOOKMAKERS) + 1
-        richness = len(bet.get("values") or [])
-        score = (len(PREFERRED_BOOKMAKERS) + 2 - pref_rank) * 100 + richness
+        score = weight + len(bet.get("values") or [])
         if best is None or score > best_score:
-            best, best_score = (book, bet), score
+            best, best_score = (name, bet), score
     return best
 
-def extract_markets(books: List[Dict[str, Any]]) -> Dict[str, Any]:
-    out: Dict[str, Any] = {}
+# Extratores por mercado: recebem os values normalizados do bet escolhido e devolvem
+# {chave do mercado: odds} (vazio se nada aproveitável); o bookmaker é anexado em extract_markets.
+MarketExtractor = Callable[[List[NormValue]], Dict[str, Dict[str, Any]]]
+
+def _extract_1x2(vals: List[NormValue], key: str, fuzzy_draw: bool = False) -> Dict[str, Dict[str, Any]]:
+    lookup = _odds_by_value(vals)
+    home = lookup.get("home") or lookup.get("1")
+    draw = lookup.get("draw") or lookup.get("x")
+    if not draw and fuzzy_draw:
+        draw = next((o for val, o in lookup.items() if "draw" in val), None)
+    away = lookup.get("away") or lookup.get("2")
+    if home or draw or away:
+        return {key: {"home": home, "draw": draw, "away": away}}
+    return {}
+
+def _extract_over_under(vals: List[NormValue]) -> Dict[str, Dict[str, Any]]:
+    """Over/Under: prefere a linha 2.5 (ou a mais próxima)."""
+    over_pick, under_pick = _nearest_over_under(2.5, vals)
+    if not (over_pick or under_pick):
+        return {}
+    return {"overUnder": {
+        "line": (over_pick or under_pick)[2] or "2.5",
+        "over": over_pick[1] if over_pick else None,
+        "under": under_pick[1] if under_pick else None,
+    }}
+
+def _extract_btts(vals: List[NormValue]) -> Dict[str, Dict[str, Any]]:
+    lookup = _odds_by_value(vals)
+    yes = lookup.get("yes")
+    no  = lookup.get("no")
+    return {"btts": {"yes": yes, "no": no}} if yes or no else {}
+
+def _extract_handicap(vals: List[NormValue]) -> Dict[str, Dict[str, Any]]:
+    """Handicap: Home -1 / Away +1 e, separadamente, a linha 0.0."""
+    eps = 1e-6
+    home_m1 = None
+    away_p1 = None
+    home_0 = None
+    away_0 = None
+    for value, odd, _, line in vals:
+        if line is None:
+            continue
+        if value == "1" or "home" in value:
+            if home_m1 is None and abs(line + 1.0) < eps:
+                home_m1 = odd
+            if home_0 is None and abs(line) < eps:
+                home_0 = odd
+        if value == "2" or "away" in value:
+            if away_p1 is None and abs(line - 1.0) < eps:
+                away_p1 = odd
+            if away_0 is None and abs(line) < eps:
+                away_0 = odd
+
+    out: Dict[str, Dict[str, Any]] = {}
+    if home_m1 or away_p1:
+        out["handicap"] = {"homeMinus1": home_m1, "awayPlus1": away_p1}
+    if home_0 or away_0:
+        out["handicapZero"] = {"home": home_0, "away": away_0}
+    return out
 
-    # Match Winner (1X2)
-    hit = _pick_bookmaker(books, RX_MATCH_WINNER)
-    if hit:
-        book, bet = hit
-        vals = bet.get("values") or []
-        home = next((v.get("odd") for v in vals if _val_eq("Home")(v) or _val_eq("1")(v)), None)
-        draw = next((v.get("odd") for v in vals if _val_eq("Draw")(v) or _val_eq("X")(v) or re.search(r"draw", str(v.get("value","")), re.I)), None)
-        away = next((v.get("odd") for v in vals if _val_eq("Away")(v) or _val_eq("2")(v)), None)
-        if home or draw or away:
-            out["matchWinner"] = {"home": home, "draw": draw, "away": away, "bookmaker": book.get("name")}
-
-    # Over/Under (preferir 2.5)
-    hit = _pick_bookmaker(books, RX_OVER_UNDER)
-    if hit:
-        book, bet = hit
-        vals = bet.get("values") or []
-        target = 2.5
-        over_exact = next((v for v in vals if re.match(r"(?i)^over", str(v.get("value",""))) and "2.5" in str(v.get("handicap") or v.get("value",""))), None)
-        under_exact = next((v for v in vals if re.match(r"(?i)^under", str(v.get("value",""))) and "2.5" in str(v.get("handicap") or v.get("value",""))), None)
-        over_pick = over_exact or _nearest_to(target, vals, lambda ov: bool(re.match(r"(?i)^over", str(ov.get("value","")))))
-        under_pick = under_exact or _nearest_to(target, vals, lambda ov: bool(re.match(r"(?i)^under", str(ov.get("value","")))))
-        if over_pick or under_pick:
-            line = _line_from(over_pick or under_pick) or "2.5"
-            out["overUnder"] = {
-                "line": line,
-                "over": (over_pick or {}).get("odd"),
-                "under": (under_pick or {}).get("odd"),
-                "bookmaker": book.get("name"),
-            }
-
-    # Both Teams To Score
-    hit = _pick_bookmaker(books, RX_BTTS)
-    if hit:
-        book, bet = hit
-        vals = bet.get("values") or []
-        yes = next((v.get("odd") for v in vals if _val_eq("Yes")(v)), None)
-        no  = next((v.get("odd") for v in vals if _val_eq("No")(v)), None)
-        if yes or no:
-            out["btts"] = {"yes": yes, "no": no, "bookmaker": book.get("name")}
-
-    # Handicap (Home -1, Away +1 e 0.0)
-    hit = _pick_bookmaker(books, RX_HANDICAP)
-    if hit:
-        book, bet = hit
-        vals = bet.get("values") or []
-        eps = 1e-6
-        home_m1 = None
-        away_p1 = None
-        home_0 = None
-        away_0 = None
-        for v in vals:
-            line = _handicap_numeric(v)
-            if line is None:
-                continue
-            if _is_team_value(v, "home"):
-                if home_m1 is None and abs(line + 1.0) < eps:
-                    home_m1 = v.get("odd")
-                if home_0 is None and abs(line) < eps:
-                    home_0 = v.get("odd")
-            if _is_team_value(v, "away"):
-                if away_p1 is None and abs(line - 1.0) < eps:
-                    away_p1 = v.get("odd")
-                if away_0 is None and abs(line) < eps:
-                    away_0 = v.get("odd")
-
-        bookmaker = book.get("name")
-        if home_m1 or away_p1:
-            out["handicap"] = {"homeMinus1": home_m1, "awayPlus1": away_p1, "bookmaker": bookmaker}
-        if home_0 or away_0:
-            out["handicapZero"] = {"home": home_0, "away": away_0, "bookmaker": bookmaker}
-
-    # First Half Winner (1X2 HT)
-    hit = _pick_bookmaker(books, RX_FIRST_HALF_WIN)
-    if hit:
-        book, bet = hit
-        vals = bet.get("values") or []
-        home = next((v.get("odd") for v in vals if _val_eq("Home")(v) or _val_eq("1")(v)), None)
-        draw = next((v.get("odd") for v in vals if _val_eq("Draw")(v) or _val_eq("X")(v)), None)
-        away = next((v.get("odd") for v in vals if _val_eq("Away")(v) or _val_eq("2")(v)), None)
-        if home or draw or away:
-            out["firstHalfWinner"] = {"home": home, "draw": draw, "away": away, "bookmaker": book.get("name")}
+# (regex do nome do bet, extrator), na ordem em que os mercados aparecem no snapshot
+MARKETS: List[Tuple[re.Pattern, MarketExtractor]] = [
+    (RX_MATCH_WINNER,   lambda vals: _extract_1x2(vals, "matchWinner", fuzzy_draw=True)),
+    (RX_OVER_UNDER,     _extract_over_under),
+    (RX_BTTS,           _extract_btts),
+    (RX_HANDICAP,       _extract_handicap),
+    (RX_FIRST_HALF_WIN, lambda vals: _extract_1x2(vals, "firstHalfWinner")),
+]
 
+def extract_markets(books: List[Dict[str, Any]]) -> Dict[str, Any]:
+    out: Dict[str, Any] = {}
+    books = _normalize_books(books)
+    for bet_rx, extract in MARKETS:
+        hit = _pick_bookmaker(books, bet_rx)
+        if not hit:
+            continue
+        bookmaker, bet = hit
+        for key, odds in extract(_normalize_values(bet.get("values") or [])).items():
+            odds["bookmaker"] = bookmaker
+            out[key] = odds
     return out
 
 # --- Persistência (snapshot + retenção) -----------------------------------------------
@@ -293,9 +423,11 @@ def extract_markets(books: List[Dict[str, Any]]) -> Dict[str, Any]:
 def save_snapshot(out: Dict[str, Any], out_dir: str, gzip_only: bool = True) -> str:
     """
     Grava:
-      - snapshot diário em {out_dir}/YYYY/MM/DD.json.gz (sempre)
-      - latest.json (não compactado) para consumo fácil pelo LLM
-    Retorna o caminho do .json.gz.
+      - snapshot diário em {out_dir}/YYYY/MM/DD.json.gz (DD.json se o payload tiver < GZIP_MIN_BYTES)
+      - latest.json (não compactado) para consumo fácil pelo LLM, trocado atomicamente
+    O JSON é serializado uma única vez e os mesmos bytes vão para os dois arquivos
+    (exceto com PRETTY=1, em que latest.json é reserializado com indentação).
+    Retorna o caminho do snapshot gravado.
     """
     date_str = out["date"]  # "YYYY-MM-DD"
     year = date_str[0:4]
@@ -306,22 +438,39 @@ def save_snapshot(out: Dict[str, Any], out_dir: str, gzip_only: bool = True) ->
     os.makedirs(dir_ym, exist_ok=True)
 
     gz_path = os.path.join(dir_ym, f"{date_str}.json.gz")
+    json_path = os.path.join(dir_ym, f"{date_str}.json")
     latest_path = os.path.join(out_dir, "latest.json")
     os.makedirs(out_dir, exist_ok=True)
 
-    # grava gzip
-    with gzip.open(gz_path, "wt", encoding="utf-8") as gz:
-        json.dump(out, gz, ensure_ascii=False)
+    payload = _json_dumps(out)
+
+    if len(payload) < GZIP_MIN_BYTES:
+        saved_path, stale_path = json_path, gz_path
+        with open(json_path, "wb") as f:
+            f.write(payload)
+    else:
+        saved_path, stale_path = gz_path, json_path
+        # grava gzip (escreve os bytes de uma vez, sem camada de texto)
+        with gzip.open(gz_path, "wb", compresslevel=GZIP_LEVEL) as gz:
+            gz.write(payload)
+    # reexecução no mesmo dia pode ter trocado o formato: fica só um snapshot por data
+    try:
+        os.remove(stale_path)
+    except FileNotFoundError:
+        pass
 
-    # grava latest.json (não compactado) para fácil leitura
-    with open(latest_path, "w", encoding="utf-8") as f:
-        json.dump(out, f, ensure_ascii=False, indent=2)
+    # grava latest.json (não compactado) via temp + rename: leitores nunca veem arquivo parcial
+    tmp_path = latest_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_json_dumps(out, indent=True) if PRETTY else payload)
+    os.replace(tmp_path, latest_path)
 
-    return gz_path
+    return saved_path
 
 def prune_old_snapshots(out_dir: str, retention_days: int) -> List[str]:
     """
-    Remove arquivos *.json.gz em out_dir com mtime mais antigo que retention_days.
+    Remove snapshots {out_dir}/YYYY/MM/YYYY-MM-DD.json(.gz) cuja data (lida do nome
+    do arquivo, sem os.stat) é mais antiga que retention_days.
     Não remove 'latest.json'.
     Retorna lista de caminhos removidos.
     """
@@ -329,24 +478,43 @@ def prune_old_snapshots(out_dir: str, retention_days: int) -> List[str]:
     if retention_days <= 0:
         return removed
 
-    cutoff = time.time() - (retention_days * 86400)
-    for root, _, files in os.walk(out_dir):
-        for fn in files:
-            if fn == "latest.json":
-                continue
-            if not fn.endswith(".json.gz"):
-                # Só o arquivamento é .json.gz; ignoramos outros artefatos
-                continue
-            fp = os.path.join(root, fn)
-            try:
-                st = os.stat(fp)
-                if st.st_mtime < cutoff:
-                    os.remove(fp)
-                    removed.append(fp)
-            except FileNotFoundError:
-                pass
-            except Exception as e:
-                print(f"warn: falha ao remover {fp}: {e}")
+    cutoff = datetime.now(TZ_SP).date() - timedelta(days=retention_days)
+    # Só o arquivamento é YYYY/MM/*.json(.gz); ignoramos outros artefatos
+    for fp in glob.iglob(os.path.join(out_dir, "*", "*", "*.json*")):
+        if not fp.endswith((".json", ".json.gz")):
+            continue
+        try:
+            file_date = datetime.strptime(os.path.basename(fp)[:10], "%Y-%m-%d").date()
+        except ValueError:
+            continue
+        if file_date >= cutoff:
+            continue
+        try:
+            os.remove(fp)
+            removed.append(fp)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"warn: falha ao remover {fp}: {e}")
+    return removed
+
+def prune_http_cache(cache_dir: str, max_age_s: int) -> int:
+    """Remove entradas do cache HTTP (ETag) mais velhas que max_age_s. Retorna quantos arquivos removeu."""
+    removed = 0
+    cutoff = time.time() - max_age_s
+    try:
+        entries = list(os.scandir(cache_dir))
+    except FileNotFoundError:
+        return removed
+    for entry in entries:
+        try:
+            if entry.is_file() and entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+                removed += 1
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"warn: falha ao remover {entry.path}: {e}")
     return removed
 
 # --- Pipeline principal ---------------------------------------------------------------
@@ -355,32 +523,42 @@ def main() -> None:
     if not API_KEY or API_KEY == "SUA_CHAVE_AQUI":
         raise SystemExit("Defina a variável de ambiente APISPORTS_KEY com sua chave da API-FOOTBALL.")
 
-    date_ymd = today_ymd("America/Sao_Paulo")
+    date_ymd = today_ymd(TZ_NAME_SP)
 
-    # (Opcional) 1x /odds/bets — mantém robustez contra variações de nome
+    # Retenção em segundo plano, sobreposta às chamadas de rede (só apaga datas anteriores ao corte,
+    # nunca o snapshot de hoje); o resultado é coletado antes de montar o meta
+    prune_pool = ThreadPoolExecutor(max_workers=1)
+    prune_fut = prune_pool.submit(prune_old_snapshots, OUT_DIR, RETENTION_DAYS)
+
+    # (Opcional) /odds/bets — mantém robustez contra variações de nome (cache de BETS_CATALOG_TTL)
     _ = get_bets_catalog()
 
-    # 5x fixtures
-    fixtures_all: List[Dict[str, Any]] = []
-    for lid in LEAGUES.values():
-        fixtures_all += get_fixtures_for_league(lid, date_ymd)
+    # 1x fixtures (dia inteiro) + 5x odds em paralelo (I/O-bound; conexões reaproveitadas via SESSION)
+    with ThreadPoolExecutor(max_workers=min(len(LEAGUES) + 1, HTTP_WORKERS)) as pool:
+        fixtures_fut = pool.submit(get_fixtures_for_date, date_ymd)
+        odds_results = list(pool.map(lambda lid: get_odds_for_league_date(lid, date_ymd), LEAGUES.values()))
+        fixtures_all: Optional[List[Dict[str, Any]]] = fixtures_fut.result()
+        if fixtures_all is None:
+            # fallback: 5x fixtures por liga
+            fixtures_all = [f for r in pool.map(lambda lid: get_fixtures_for_league(lid, date_ymd), LEAGUES.values())
+                            for f in r]
+    odds_all: List[Dict[str, Any]] = [it for r in odds_results for it in r]
 
     # Index por fixtureId
     by_fixture: Dict[int, Dict[str, Any]] = {}
+    # vários jogos compartilham o horário de início: converte cada string distinta uma só vez
+    dt_cache: Dict[str, str] = {}
     for f in fixtures_all:
-        fixture = f.get("fixture", {})
-        league  = f.get("league", {})
-        teams   = f.get("teams", {})
+        fixture = f.get("fixture") or EMPTY
+        league  = f.get("league") or EMPTY
+        teams   = f.get("teams") or EMPTY
         fid     = int(fixture.get("id"))
         dt      = fixture.get("date")
-        status  = (fixture.get("status") or {}).get("short", "")
+        status  = (fixture.get("status") or EMPTY).get("short", "")
         # normaliza data para o fuso de SP, se possível
-        try:
-            dt_parsed = datetime.fromisoformat(str(dt).replace("Z", "+00:00"))
-            dt_sp = dt_parsed.astimezone(_tz("America/Sao_Paulo"))
-            dt_str = dt_sp.strftime("%Y-%m-%d %H:%M:%S %z")
-        except Exception:
-            dt_str = str(dt)
+        dt_str = dt_cache.get(dt)
+        if dt_str is None:
+            dt_str = dt_cache[dt] = to_sp_datetime_str(dt)
 
         by_fixture[fid] = {
             "fixtureId": fid,
@@ -388,22 +566,20 @@ def main() -> None:
             "status": status,
             "leagueId": int(league.get("id")),
             "league": f"{league.get('country','') or ''} {league.get('name','')}".strip(),
-            "home": (teams.get("home") or {}).get("name"),
-            "away": (teams.get("away") or {}).get("name"),
+            "home": (teams.get("home") or EMPTY).get("name"),
+            "away": (teams.get("away") or EMPTY).get("name"),
             "markets": {},
         }
 
-    # 5x odds (sem filtro de bet -> todos mercados)
-    for lid in LEAGUES.values():
-        items = get_odds_for_league_date(lid, date_ymd)
-        for it in items:
-            fid = int((it.get("fixture") or {}).get("id", 0))
-            if fid == 0 or fid not in by_fixture:
-                continue
-            books = (it.get("bookmakers") or [])
-            markets = extract_markets(books)
-            if markets:
-                by_fixture[fid]["markets"].update({k: v for k, v in markets.items() if v})
+    # odds (sem filtro de bet -> todos mercados)
+    for it in odds_all:
+        fid = int((it.get("fixture") or EMPTY).get("id", 0))
+        if fid == 0 or fid not in by_fixture:
+            continue
+        books = (it.get("bookmakers") or [])
+        markets = extract_markets(books)
+        if markets:
+            by_fixture[fid]["markets"].update({k: v for k, v in markets.items() if v})
 
     # Resultado final
     items_out = sorted(by_fixture.values(), key=lambda r: (r["date"], r["leagueId"], r["fixtureId"]))
@@ -412,8 +588,10 @@ def main() -> None:
     # Persistência com compactação + latest.json
     gz_path = save_snapshot(out, OUT_DIR, gzip_only=True)
 
-    # Retenção
-    removed = prune_old_snapshots(OUT_DIR, RETENTION_DAYS)
+    # Retenção (iniciada no começo do main)
+    removed = prune_fut.result()
+    prune_pool.shutdown()
+    prune_http_cache(HTTP_CACHE_DIR, HTTP_CACHE_TTL)
 
     # Logs simples e JSON no stdout
     meta = {
@@ -422,7 +600,7 @@ def main() -> None:
         "retention_days": RETENTION_DAYS,
         "out_dir": OUT_DIR,
     }
-    print(json.dumps({"meta": meta, "snapshot": out}, ensure_ascii=False))
+    print(_json_dumps({"meta": meta, "snapshot": out}).decode("utf-8"))
 
 if __name__ == "__main__":
     main()